@@ -0,0 +1,181 @@
+import asyncio
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from aiohttp import web
+
+from control_service import AppServer
+
+BROADCAST_HOST = "0.0.0.0"   # venue screens connect over the LAN
+BROADCAST_PORT = 8090
+BROADCAST_SIZE = (1280, 720)  # largest output (width, height); None keeps the camera size
+BROADCAST_JPEG_QUALITY = 75
+BOUNDARY = b"frame"
+
+
+def lan_address():
+    """This machine's address on the network it routes outward through."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        try:
+            s.connect(("10.255.255.255", 1))  # UDP connect sends nothing
+            return s.getsockname()[0]
+        except OSError:
+            return "127.0.0.1"
+
+
+def fit_within(width, height, box):
+    """Largest (width, height) with the same aspect ratio that fits in `box`, never upscaled."""
+    if not box:
+        return width, height
+    scale = min(box[0] / width, box[1] / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+# ------------------------------------------------------------------
+# Per-camera latest frame
+# ------------------------------------------------------------------
+
+class _Stream:
+    """Latest encoded frame of one camera plus its viewer count."""
+
+    def __init__(self):
+        self.seq = 0
+        self.jpeg = None
+        self.viewers = 0
+        self.encoding = False
+        self.skipped = 0  # frames not encoded because the previous one was still in flight
+        self.closed = False
+        self._changed = None
+
+    def set_frame(self, jpeg):
+        self.seq += 1
+        self.jpeg = jpeg
+        self._wake()
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        if self._changed is not None and not self._changed.done():
+            self._changed.set_result(None)
+        self._changed = None
+
+    async def next_frame(self, after):
+        """Wait for a frame newer than `after`; returns (seq, jpeg), or None once closed.
+
+        Viewers that fall behind only ever see the newest frame, so they
+        skip frames instead of building a backlog.
+        """
+        while self.seq <= after:
+            if self.closed:
+                return None
+            if self._changed is None:
+                self._changed = asyncio.get_running_loop().create_future()
+            await asyncio.shield(self._changed)
+        return None if self.closed else (self.seq, self.jpeg)
+
+# ------------------------------------------------------------------
+# MJPEG broadcaster
+# ------------------------------------------------------------------
+
+class FrameBroadcaster(AppServer):
+    """Serve annotated camera frames as MJPEG over HTTP to any number of viewers.
+
+        GET /cameras/{id}/video.mjpg
+
+    Each published frame is resized and JPEG-encoded once on a small worker
+    pool, and the resulting bytes object is written to every viewer.
+    Frames larger than `size` are scaled down to fit inside it, keeping
+    their aspect ratio; smaller frames are never scaled up.
+    """
+
+    def __init__(self, host=BROADCAST_HOST, port=BROADCAST_PORT, size=BROADCAST_SIZE,
+                 quality=BROADCAST_JPEG_QUALITY, workers=2):
+        super().__init__(host, port, name="mjpeg-broadcast")
+        self.size = size
+        self.quality = quality
+        self.app.add_routes([web.get("/cameras/{camera}/video.mjpg", self.video)])
+        self.app.on_shutdown.append(self._close_streams)
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="mjpeg-encode")
+        self._streams = {}
+
+    def stop(self, timeout=5.0):
+        super().stop(timeout)
+        self._pool.shutdown(wait=False)
+
+    @property
+    def url(self):
+        host = lan_address() if self.host in ("0.0.0.0", "") else self.host
+        return f"http://{host}:{self.port}"
+
+    def stream_url(self, camera_id):
+        return f"{self.url}/cameras/{camera_id}/video.mjpg"
+
+    # -------------------- camera side -----------------------------
+
+    def add_camera(self, camera_id):
+        """Make `/cameras/{camera_id}/video.mjpg` available; other ids get 404."""
+        self._streams.setdefault(camera_id, _Stream())
+
+    def publish(self, camera_id, frame):
+        """Queue an annotated frame; called on the camera thread, never blocks.
+
+        Nothing is encoded while nobody is watching, and a new frame is
+        skipped while the previous one of the same camera is still encoding.
+        """
+        stream = self._streams.setdefault(camera_id, _Stream())
+        if self._loop is None or not stream.viewers:
+            return
+        if stream.encoding:
+            stream.skipped += 1
+            return
+        stream.encoding = True
+        self._pool.submit(self._encode, stream, frame)
+
+    def _encode(self, stream, frame):
+        try:
+            size = fit_within(frame.shape[1], frame.shape[0], self.size)
+            if size != (frame.shape[1], frame.shape[0]):
+                frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                self._loop.call_soon_threadsafe(stream.set_frame, jpeg.tobytes())
+        except RuntimeError:
+            pass  # loop closed while shutting down
+        finally:
+            stream.encoding = False
+
+    # -------------------- viewer side -----------------------------
+
+    async def _close_streams(self, app):
+        for stream in self._streams.values():
+            stream.close()
+
+    async def video(self, request):
+        stream = self._streams.get(request.match_info["camera"])
+        if stream is None:
+            raise web.HTTPNotFound(text=f"Unknown camera {request.match_info['camera']!r}")
+        response = web.StreamResponse(headers={
+            "Content-Type": f"multipart/x-mixed-replace; boundary={BOUNDARY.decode()}",
+            "Cache-Control": "no-cache",
+        })
+        await response.prepare(request)
+
+        stream.viewers += 1
+        seq = 0
+        try:
+            while True:
+                frame = await stream.next_frame(seq)
+                if frame is None:  # server shutting down
+                    break
+                seq, jpeg = frame
+                await response.write(b"--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
+                                     % (BOUNDARY, len(jpeg)))
+                await response.write(jpeg)
+                await response.write(b"\r\n")
+        except ConnectionResetError:
+            pass
+        finally:
+            stream.viewers -= 1
+        return response
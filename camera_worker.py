@@ -0,0 +1,371 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import cv2
+
+from inference_server import PRIORITY_ACTIVE, PRIORITY_IDLE, PRIORITY_SIGNAL
+from recognition import (STOP_FIGHT_POSES, classify_hand_gesture, classify_pose,
+                         create_hands, create_pose, hand_sides, mp_draw, mp_hands,
+                         mp_pose, pose_visibility, run_models)
+from replay_buffer import REPLAY_WINDOW, ReplayBuffer, ReplayPlayer
+
+STREAM_RETRIES = 3    # reopen attempts after an IP camera stream drops
+RETRY_DELAY = 1.0
+
+ACTIVITY_SIZE = (64, 36)  # thumbnail the motion estimate is taken on
+ACTIVE_MOTION = 4.0       # mean grey-level change per frame that counts as an exchange
+ACTIVITY_SMOOTHING = 0.3
+
+# ------------------------------------------------------------------
+# Mat activity
+# ------------------------------------------------------------------
+
+class ActivityMeter:
+    """Cheap "is anything happening on the mat" estimate for scheduling.
+
+    Smoothed mean absolute difference between consecutive grey
+    thumbnails; costs a resize per frame and needs no model.
+    """
+
+    def __init__(self, threshold=ACTIVE_MOTION, smoothing=ACTIVITY_SMOOTHING):
+        self.threshold = threshold
+        self.smoothing = smoothing
+        self.level = 0.0
+        self._previous = None
+
+    @property
+    def active(self):
+        return self.level >= self.threshold
+
+    def update(self, frame):
+        grey = cv2.cvtColor(cv2.resize(frame, ACTIVITY_SIZE, interpolation=cv2.INTER_AREA),
+                            cv2.COLOR_BGR2GRAY)
+        if self._previous is not None and self._previous.shape == grey.shape:
+            motion = float(cv2.absdiff(grey, self._previous).mean())
+            self.level += self.smoothing * (motion - self.level)
+        self._previous = grey
+        return self.active
+
+# ------------------------------------------------------------------
+# Camera worker
+# ------------------------------------------------------------------
+
+class CameraWorker:
+    """Capture + recognition loop for one camera, running on its own thread.
+
+    Control methods are safe to call from any thread. Listeners get a state
+    dict whenever the pose, gestures, score or run state change; they are
+    called on the worker thread and must not block.
+
+    With an InferenceServer the worker owns no MediaPipe graphs: it keeps one
+    frame in flight, keeps reading (and skipping) frames meanwhile so the
+    stream does not back up, and raises its priority while a signal is
+    pending or an arm is raised, and less so while the mat is active.
+
+    When `fusion` has a ScoringEngine, the mat is scored once from the fused
+    decisions; the worker only reads that engine for its overlay and
+    priority, and its own `scoring` argument is ignored.
+    """
+
+    def __init__(self, camera_id, source=0, width=1280, height=720, show=True,
+                 broadcaster=None, fusion=None, scoring=None, gate=None, inference=None):
+        self.camera_id = camera_id
+        self.width = width
+        self.height = height
+        self.show = show
+        self.broadcaster = broadcaster
+        self.fusion = fusion
+        self._scores_frames = fusion is None or fusion.scoring is None
+        self.scoring = scoring if self._scores_frames else fusion.scoring
+        self.gate = gate
+        self.inference = inference
+        self.activity = ActivityMeter()
+        self.window = f"BJJ Scoring Demo ({camera_id})"
+        if broadcaster is not None:
+            broadcaster.add_camera(camera_id)
+
+        self.replay = ReplayBuffer(camera_id)
+        self.replay_player = ReplayPlayer(f"{REPLAY_WINDOW} ({camera_id})")
+
+        self._source = source
+        self._source_changed = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+        self.pose = "Unknown"
+        self.gestures = []
+        self.score_signalled = 0
+        self.error = None
+        self.reconnects = 0
+        self.skipped = 0  # frames read while the shared server was still busy
+
+    # -------------------- control ---------------------------------
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def source(self):
+        return self._source
+
+    def start(self):
+        """Start the worker thread; returns False if it is already running."""
+        with self._lock:
+            if self.running or self.replay.closed:
+                return False
+            self._stop.clear()
+            self.error = None
+            self._thread = threading.Thread(target=self._run, daemon=True,
+                                            name=f"camera-{self.camera_id}")
+            self._thread.start()
+        return True
+
+    def stop(self, timeout=5.0):
+        """Ask the worker to stop and wait; True once the thread has exited."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        return not self.running
+
+    def close(self, timeout=5.0):
+        """Stop the worker and release its replay buffer; it can't be restarted."""
+        stopped = self.stop(timeout)
+        self.replay_player.stop()
+        self.replay.close()
+        return stopped
+
+    def set_source(self, source):
+        """Switch capture source; a running worker reopens it on the next frame."""
+        with self._lock:
+            self._source = source
+            self._source_changed = True
+        self._publish()
+
+    def replay_last(self, seconds=None):
+        self.replay_player.play(self.replay.snapshot(seconds))
+
+    # -------------------- state / events --------------------------
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def state(self):
+        return {
+            "camera": self.camera_id,
+            "source": self._source,
+            "running": self.running and not self._stop.is_set(),
+            "pose": self.pose,
+            "gestures": list(self.gestures),
+            "score_signalled": self.score_signalled,
+            "stop_fight": self.pose in STOP_FIGHT_POSES,
+            "error": self.error,
+            "match": self.scoring.snapshot() if self.scoring is not None else None,
+            "hand_gate": self.gate.stats() if self.gate is not None else None,
+        }
+
+    def _publish(self):
+        state = self.state()
+        for callback in list(self._listeners):
+            callback(state)
+
+    def _update(self, pose, gestures, score, scored=False):
+        changed = (pose, gestures, score) != (self.pose, self.gestures, self.score_signalled)
+        self.pose, self.gestures, self.score_signalled = pose, gestures, score
+        if changed or scored:
+            self._publish()
+
+    # -------------------- worker loop -----------------------------
+
+    def _open(self):
+        with self._lock:
+            source, self._source_changed = self._source, False
+        cap = cv2.VideoCapture(source)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return cap
+
+    def _is_stream(self):
+        return isinstance(self._source, str) and "://" in self._source
+
+    def _run(self):
+        models = (create_pose(), create_hands()) if self.inference is None else None
+        pending = None  # (future, frame, timestamp) on the shared server
+        cap = self._open()
+        self._publish()
+        failures = 0
+        try:
+            while not self._stop.is_set():
+                if self._source_changed:
+                    cap.release()
+                    cap = self._open()
+
+                ret, frame = cap.read()
+                if not ret:
+                    # phones on venue Wi-Fi drop out; reopen streams a few times
+                    failures += 1
+                    if not self._is_stream() or failures > STREAM_RETRIES:
+                        self.error = f"No frames from {self._source!r}"
+                        break
+                    cap.release()
+                    self._stop.wait(RETRY_DELAY)
+                    cap = self._open()
+                    self.reconnects += 1
+                    continue
+                failures = 0
+                timestamp = time.monotonic()
+
+                if models is not None:
+                    self._process(frame, timestamp, *models)
+                    shown = frame
+                else:
+                    shown = None
+                    if pending is not None and pending[0].done():
+                        shown = self._collect(*pending)
+                        pending = None
+                        if self._stop.is_set():  # the server failed or was stopped
+                            break
+                    if pending is None:
+                        self.activity.update(frame)
+                        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                        pending = (self.inference.submit(self.camera_id, rgb, self.gate),
+                                   frame, timestamp)
+                    else:
+                        self.skipped += 1
+
+                if self.show and not self._handle_window(shown):
+                    break
+        finally:
+            self._stop.set()
+            self.replay_player.stop()
+            cap.release()
+            if models is not None:
+                for graph in models:
+                    graph.close()
+            if pending is not None:
+                pending[0].cancel()
+            if self.show:
+                cv2.destroyWindow(self.window)
+                self.replay_player.show()
+            self._publish()
+
+    def _process(self, frame, timestamp, pose, hands):
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self._handle(frame, timestamp, run_models(rgb, pose, hands, self.gate))
+
+    def _collect(self, future, frame, timestamp):
+        """Handle a finished shared-server request; returns the frame to show.
+
+        If the models failed or the server was stopped, records the error
+        and stops the worker.
+        """
+        try:
+            result = future.result()
+        except CancelledError:
+            return None
+        except Exception as e:
+            self.error = f"Inference failed: {e}"
+            self._stop.set()
+            return None
+        self._handle(frame, timestamp, result)
+        self.inference.set_priority(self.camera_id, self._priority())
+        return frame
+
+    def _priority(self):
+        if ((self.scoring is not None and self.scoring.pending)
+                or (self.gate is not None and self.gate.active)):
+            return PRIORITY_SIGNAL
+        return PRIORITY_ACTIVE if self.activity.active else PRIORITY_IDLE
+
+    def _handle(self, frame, timestamp, result):
+        """Classify, annotate and publish one frame's model results."""
+        pose_landmarks, hand_landmarks, handedness, open_sides = result
+
+        # Pose ---------------------------------------------------------
+        if pose_landmarks:
+            current_pose = classify_pose(pose_landmarks.landmark)
+            visibility = pose_visibility(pose_landmarks.landmark)
+            mp_draw.draw_landmarks(frame, pose_landmarks, mp_pose.POSE_CONNECTIONS)
+        else:
+            current_pose = "Unknown"
+            visibility = 0.0
+
+        # Hands (only for arms the gate left open) ---------------------
+        current_gestures = []
+        fused_hands = []  # (side, gesture, handedness score)
+        gestures_by_side = {}
+        kept_landmarks = []
+        total_pts = 0
+
+        sides = hand_sides(pose_landmarks, hand_landmarks, handedness)
+        for hlm, handed, side in zip(hand_landmarks, handedness, sides):
+            if open_sides is not None and side not in open_sides:
+                continue  # hand on a lowered arm is not a signal
+            gesture = classify_hand_gesture(hlm)
+            current_gestures.append(gesture)
+            fused_hands.append((side, gesture, handed.classification[0].score))
+            gestures_by_side[side] = gesture
+            kept_landmarks.append(hlm)
+            if "Points" in gesture:
+                total_pts += int(gesture.split()[0])
+            mp_draw.draw_landmarks(frame, hlm, mp_hands.HAND_CONNECTIONS)
+
+        # Scoring ------------------------------------------------------
+        events = []
+        if self.scoring is not None and self._scores_frames:
+            events = self.scoring.update(timestamp, current_pose, gestures_by_side)
+
+        # -------------------- overlays --------------------------------
+        cv2.putText(frame, f"Pose: {current_pose}", (10, 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+        for idx, g in enumerate(current_gestures):
+            cv2.putText(frame, f"Hand {idx+1}: {g}", (10, 80 + 40*idx),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+
+        cv2.putText(frame, f"Score Signalled: {total_pts}", (10, 80 + 40*len(current_gestures) + 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
+
+        if current_pose in STOP_FIGHT_POSES:
+            h, w, _ = frame.shape
+            cv2.putText(frame, "STOP FIGHT", (int(w*0.15), int(h*0.55)),
+                        cv2.FONT_HERSHEY_DUPLEX, 2.5, (0, 0, 255), 5)
+
+        if self.scoring is not None:
+            s, a = self.scoring.scores, self.scoring.advantages
+            cv2.putText(frame, f"P1 {s[1]} (A{a[1]})   P2 {s[2]} (A{a[2]})", (10, frame.shape[0] - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3)
+
+        self.replay.push(frame, timestamp,
+                         pose_landmarks, kept_landmarks,
+                         current_pose, current_gestures)
+        if self.broadcaster is not None:
+            self.broadcaster.publish(self.camera_id, frame)
+        if self.fusion is not None:
+            self.fusion.submit(self.camera_id, timestamp, current_pose, visibility, fused_hands)
+        self._update(current_pose, current_gestures, total_pts, scored=bool(events))
+
+    def _handle_window(self, frame):
+        """Show the live and replay windows; False when the user pressed q."""
+        if frame is not None:
+            cv2.imshow(self.window, frame)
+        self.replay_player.show()
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            return False
+        if key == ord('r'):
+            self.replay_last()
+        elif key == ord(']'):
+            self.replay_player.faster()
+        elif key == ord('['):
+            self.replay_player.slower()
+        return True
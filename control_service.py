@@ -0,0 +1,272 @@
+import asyncio
+import threading
+
+from aiohttp import WSCloseCode, WSMsgType, web
+
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 8765
+SUBSCRIBER_QUEUE_SIZE = 32
+SHUTDOWN_TIMEOUT = 1.0   # seconds open connections get to finish on stop()
+
+# ------------------------------------------------------------------
+# Event fan-out
+# ------------------------------------------------------------------
+
+class Subscriber:
+    """One WebSocket client's bounded event queue.
+
+    When a client falls behind, the oldest queued event is dropped so
+    publishing never waits on the slowest reader.
+    """
+
+    def __init__(self, size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue = asyncio.Queue(maxsize=size)
+        self.dropped = 0
+
+    def offer(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    def close(self):
+        """Wake the client's handler so it closes the socket (None = end of stream)."""
+        self.offer(None)
+
+# ------------------------------------------------------------------
+# Background aiohttp server
+# ------------------------------------------------------------------
+
+class AppServer:
+    """aiohttp application served from its own event loop on a daemon thread.
+
+    Subclasses with long-lived handlers must end them from an
+    `app.on_shutdown` hook; anything still open after `SHUTDOWN_TIMEOUT`
+    is cancelled.
+    """
+
+    def __init__(self, host, port, name="app-server"):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.app = web.Application()
+        self.error = None
+        self._loop = None
+        self._shutdown = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving and wait until the port is bound; raises OSError if it can't be."""
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),),
+                                        daemon=True, name=self.name)
+        self._thread.start()
+        self._ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def stop(self, timeout=5.0):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._shutdown.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._shutdown = asyncio.Event()
+        runner = web.AppRunner(self.app, shutdown_timeout=SHUTDOWN_TIMEOUT)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+            self._ready.set()
+            await self._shutdown.wait()
+        except OSError as e:
+            self.error = e
+        finally:
+            self._ready.set()
+            await runner.cleanup()
+
+# ------------------------------------------------------------------
+# HTTP / WebSocket service
+# ------------------------------------------------------------------
+
+class ControlService(AppServer):
+    """Local asyncio HTTP/WebSocket API over a dict of CameraWorkers.
+
+        GET  /cameras                 current state of every camera
+        GET  /cameras/{id}            state of one camera
+        POST /cameras/{id}/start
+        POST /cameras/{id}/stop       waits until the worker thread has exited
+        POST /cameras/{id}/source     body {"source": 0 | "http://…/video"}
+        GET  /fusion                  latest fused decision of all views of the mat, with the score
+        GET  /inference               shared model pool: latency and queue depth per camera
+                                      (404 when the cameras run their own models)
+        GET  /events                  WebSocket stream of state-change events
+
+    The service runs its own event loop on a background thread; camera
+    workers hand events over with call_soon_threadsafe and never block.
+    """
+
+    def __init__(self, cameras, host=CONTROL_HOST, port=CONTROL_PORT,
+                 queue_size=SUBSCRIBER_QUEUE_SIZE, fusion=None, inference=None):
+        super().__init__(host, port, name="control-service")
+        self.cameras = cameras
+        self.fusion = fusion
+        self.inference = inference
+        self.queue_size = queue_size
+        self.app.add_routes([
+            web.get("/cameras", self.list_cameras),
+            web.get("/cameras/{camera}", self.get_camera),
+            web.post("/cameras/{camera}/start", self.start_camera),
+            web.post("/cameras/{camera}/stop", self.stop_camera),
+            web.post("/cameras/{camera}/source", self.set_source),
+            web.get("/fusion", self.get_fusion),
+            web.get("/inference", self.get_inference),
+            web.get("/events", self.events),
+        ])
+        self.app.on_shutdown.append(self._close_subscribers)
+        self._subscribers = set()
+        self._last_fused = None
+
+    def start(self):
+        super().start()
+        for camera in self.cameras.values():
+            camera.add_listener(self._on_camera_event)
+        if self.fusion is not None:
+            self.fusion.add_listener(self._on_fused_decision)
+
+    def add_camera(self, camera):
+        """Serve another CameraWorker (e.g. an extra view of the mat) from now on."""
+        self.cameras[camera.camera_id] = camera
+        if self._loop is not None:
+            camera.add_listener(self._on_camera_event)
+
+    def stop(self, timeout=5.0):
+        for camera in self.cameras.values():
+            camera.remove_listener(self._on_camera_event)
+        if self.fusion is not None:
+            self.fusion.remove_listener(self._on_fused_decision)
+        super().stop(timeout)
+
+    # -------------------- events ----------------------------------
+
+    def _on_camera_event(self, state):
+        """Called on camera worker threads; hops onto the service loop."""
+        try:
+            self._loop.call_soon_threadsafe(self._broadcast, {"type": "state", **state})
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    def _on_fused_decision(self, decision):
+        """Called on the fusion thread; only decisions that change are sent."""
+        previous = self._last_fused
+        self._last_fused = decision
+        if previous is not None and ((previous.pose, previous.gestures, previous.match)
+                                     == (decision.pose, decision.gestures, decision.match)):
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._broadcast, {"type": "fused", **decision._asdict()})
+        except RuntimeError:
+            pass
+
+    def _broadcast(self, event):
+        for subscriber in self._subscribers:
+            subscriber.offer(event)
+
+    async def _close_subscribers(self, app):
+        for subscriber in self._subscribers:
+            subscriber.close()
+
+    async def events(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        for camera in list(self.cameras.values()):
+            subscriber.offer({"type": "state", **camera.state()})
+
+        reader = asyncio.create_task(self._drain_client(ws))
+        try:
+            while not reader.done():
+                getter = asyncio.create_task(subscriber.queue.get())
+                done, _ = await asyncio.wait({getter, reader},
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    break
+                event = getter.result()
+                if event is None:  # service shutting down
+                    break
+                if subscriber.dropped:
+                    event = {**event, "dropped": subscriber.dropped}
+                await ws.send_json(event)
+        except ConnectionResetError:
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            reader.cancel()
+            await ws.close(code=WSCloseCode.GOING_AWAY)
+        return ws
+
+    @staticmethod
+    async def _drain_client(ws):
+        async for msg in ws:
+            if msg.type == WSMsgType.ERROR:
+                break
+
+    # -------------------- camera control --------------------------
+
+    def _camera(self, request):
+        camera = self.cameras.get(request.match_info["camera"])
+        if camera is None:
+            raise web.HTTPNotFound(text=f"Unknown camera {request.match_info['camera']!r}")
+        return camera
+
+    async def list_cameras(self, request):
+        return web.json_response([camera.state() for camera in list(self.cameras.values())])
+
+    async def get_camera(self, request):
+        return web.json_response(self._camera(request).state())
+
+    async def get_fusion(self, request):
+        if self.fusion is None:
+            raise web.HTTPNotFound(text="Multi-camera fusion is not enabled")
+        latest = self.fusion.latest
+        return web.json_response(latest._asdict() if latest else None)
+
+    async def get_inference(self, request):
+        if self.inference is None:
+            raise web.HTTPNotFound(text="Cameras run their own models; no shared inference server")
+        return web.json_response(self.inference.stats())
+
+    async def start_camera(self, request):
+        camera = self._camera(request)
+        started = camera.start()
+        return web.json_response({"started": started, **camera.state()})
+
+    async def stop_camera(self, request):
+        camera = self._camera(request)
+        # join() blocks, so run it off the event loop
+        stopped = await self._loop.run_in_executor(None, camera.stop)
+        return web.json_response({"stopped": stopped, **camera.state()},
+                                 status=200 if stopped else 504)
+
+    async def set_source(self, request):
+        camera = self._camera(request)
+        try:
+            body = await request.json()
+            source = body["source"]
+        except (ValueError, KeyError, TypeError):
+            raise web.HTTPBadRequest(text='Expected JSON body {"source": 0 | "http://…/video"}')
+        if isinstance(source, str) and source.strip().isdigit():
+            source = int(source)  # cv2.VideoCapture("0") would look for a file named 0
+        if (not isinstance(source, (int, str)) or isinstance(source, bool)
+                or isinstance(source, str) and "://" not in source):
+            raise web.HTTPBadRequest(text="source must be a device index or a stream URL")
+        camera.set_source(source)
+        return web.json_response(camera.state())
@@ -1,6 +1,3 @@
-import cv2
-import mediapipe as mp
-import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 import requests
@@ -9,6 +6,14 @@ import io
 import os
 import webbrowser
 
+from broadcast import FrameBroadcaster
+from camera_worker import CameraWorker
+from control_service import ControlService
+from fusion import MultiViewFusion
+from gating import HandGate
+from inference_server import InferenceServer
+from scoring import MatchLog, ScoringEngine
+
 # URL to the Forest theme GitHub repository zip file
 FOREST_THEME_REPO_ZIP = "https://github.com/rdbende/Forest-ttk-theme/archive/refs/heads/master.zip"
 FOREST_THEME_DIR = "Forest-ttk-theme-master"
@@ -33,171 +38,94 @@ def setup_forest_theme():
     return True
 
 # ------------------------------------------------------------------
-# MediaPipe initialisation
+# Camera + control service
 # ------------------------------------------------------------------
 
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(static_image_mode=False,
-                    min_detection_confidence=0.5,
-                    min_tracking_confidence=0.5)
+# One entry per camera watching the mat (up to MAX_VIEWS); more views can be
+# added from the GUI, e.g. [0, "http://192.168.0.212:8080/video"]
+CAMERA_SOURCES = [0]  # 0 = default/laptop cam
+MAX_VIEWS = 3
+# >0: all views share this many model instances instead of each loading its
+# own tracking models; worth it only with more views than spare CPU cores
+SHARED_MODEL_INSTANCES = 0
 
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(static_image_mode=False,
-                       max_num_hands=2,
-                       min_detection_confidence=0.5,
-                       min_tracking_confidence=0.5)
+broadcaster = FrameBroadcaster()
+match_log = MatchLog()
+fusion = MultiViewFusion(scoring=ScoringEngine(log=match_log))  # one score for the whole mat
+inference = InferenceServer(SHARED_MODEL_INSTANCES) if SHARED_MODEL_INSTANCES else None
+cameras = {}
 
-mp_draw = mp.solutions.drawing_utils
 
-# ------------------------------------------------------------------
-# Globals
-# ------------------------------------------------------------------
+def add_view(source):
+    """Create the next camera on this mat; only the first one opens a window."""
+    camera_id = f"cam{len(cameras)}"
+    cameras[camera_id] = CameraWorker(camera_id, source=source, show=not cameras,
+                                      broadcaster=broadcaster, fusion=fusion, gate=HandGate(),
+                                      inference=inference)
+    return cameras[camera_id]
 
-camera_running = False
-camera_source = 0  # 0 = default/laptop cam
-current_pose = "Unknown"
-current_gestures = []
-STOP_FIGHT_POSES = {"Arms Extended", "T-pose"}
-
-# ------------------------------------------------------------------
-# Hand‑gesture utilities
-# ------------------------------------------------------------------
 
-def count_extended_fingers(hand_landmarks):
-    """Return the number of raised fingers (index→pinky)."""
-    finger_tips = [8, 12, 16, 20]
-    return sum(1 for tip in finger_tips
-               if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y)
-
-
-def classify_hand_gesture(hand_landmarks):
-    """Map finger‑count or classic shapes → label/string."""
-    fingers_up = count_extended_fingers(hand_landmarks)
-    if fingers_up in (2, 3, 4):
-        return f"{fingers_up} Points"
-
-    # fallback mini‑set of gestures
-    FINGER_TIPS = [4, 8, 12, 16, 20]
-    states = [int(hand_landmarks.landmark[t].y < hand_landmarks.landmark[t-2].y)
-              for t in FINGER_TIPS]
-    if states == [1, 0, 0, 0, 0]:
-        return "Thumb Up"
-    if states == [1, 1, 1, 1, 1]:
-        return "All Fingers Extended"
-    return "Unknown"
+for source in CAMERA_SOURCES[:MAX_VIEWS]:
+    add_view(source)
+camera = cameras["cam0"]  # the view the source controls below switch
+control = ControlService(cameras, fusion=fusion, inference=inference)
 
 # ------------------------------------------------------------------
-# Pose utilities
-# ------------------------------------------------------------------
-
-def classify_pose(lm):
-    ls, rs = lm[mp_pose.PoseLandmark.LEFT_SHOULDER], lm[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-    lw, rw = lm[mp_pose.PoseLandmark.LEFT_WRIST], lm[mp_pose.PoseLandmark.RIGHT_WRIST]
-
-    if abs(ls.y - rs.y) < 0.1:  # shoulders roughly level
-        # wrists roughly level w/ shoulders → classic T
-        if abs(lw.y - ls.y) < 0.1 and abs(rw.y - rs.y) < 0.1:
-            return "T-pose"
-        # wrists far left/right of shoulders → arms straight out
-        if lw.x < ls.x and rw.x > rs.x:
-            return "Arms Extended"
-        return "Standing Upright"
-    return "Unknown"
-
-# ------------------------------------------------------------------
-# Camera worker
+# GUI helpers
 # ------------------------------------------------------------------
 
-def run_camera():
-    global camera_running, current_pose, current_gestures
-
-    cap = cv2.VideoCapture(camera_source)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-
-    while camera_running:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Pose ---------------------------------------------------------
-        pose_res = pose.process(rgb)
-        if pose_res.pose_landmarks:
-            current_pose = classify_pose(pose_res.pose_landmarks.landmark)
-            mp_draw.draw_landmarks(frame, pose_res.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-        else:
-            current_pose = "Unknown"
-
-        # Hands --------------------------------------------------------
-        hand_res = hands.process(rgb)
-        current_gestures = []
-        total_pts = 0
-
-        if hand_res.multi_hand_landmarks:
-            for hlm in hand_res.multi_hand_landmarks:
-                gesture = classify_hand_gesture(hlm)
-                current_gestures.append(gesture)
-                if "Points" in gesture:
-                    total_pts += int(gesture.split()[0])
-                mp_draw.draw_landmarks(frame, hlm, mp_hands.HAND_CONNECTIONS)
-
-        # -------------------- overlays --------------------------------
-        cv2.putText(frame, f"Pose: {current_pose}", (10, 40),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+def start_camera():
+    for cam in cameras.values():
+        cam.start()
 
-        for idx, g in enumerate(current_gestures):
-            cv2.putText(frame, f"Hand {idx+1}: {g}", (10, 80 + 40*idx),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
 
-        cv2.putText(frame, f"Score Signalled: {total_pts}", (10, 80 + 40*len(current_gestures) + 40),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255), 3)
+def stop_camera():
+    if not all([cam.stop() for cam in cameras.values()]):
+        messagebox.showwarning("Camera", "Camera is still shutting down")
 
-        if current_pose in STOP_FIGHT_POSES:
-            h, w, _ = frame.shape
-            cv2.putText(frame, "STOP FIGHT", (int(w*0.15), int(h*0.55)),
-                        cv2.FONT_HERSHEY_DUPLEX, 2.5, (0, 0, 255), 5)
 
-        cv2.imshow("BJJ Scoring Demo", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+def show_replay():
+    if not camera.running:
+        messagebox.showinfo("Replay", "Start the camera first")
+        return
+    camera.replay_last()
 
-    cap.release()
-    cv2.destroyAllWindows()
 
-# ------------------------------------------------------------------
-# GUI helpers
-# ------------------------------------------------------------------
-
-def start_camera():
-    global camera_running
-    if not camera_running:
-        camera_running = True
-        threading.Thread(target=run_camera, daemon=True).start()
+def ip_cam_url(ip_digits):
+    """Phone IP-cam URL from the last two octets, or None if they don't parse."""
+    o = ip_digits.split('.')
+    if len(o) == 2 and all(i.isdigit() and 0 <= int(i) <= 255 for i in o):
+        return f"http://192.168.{ip_digits}:8080/video"
+    return None
 
 
-def stop_camera():
-    global camera_running
-    camera_running = False
+def set_camera_source(ip_digits):
+    url = ip_cam_url(ip_digits)
+    if url is None:
+        messagebox.showerror("Input", "Enter last two octets like 0.212")
+        return
+    camera.set_source(url)
+    messagebox.showinfo("Camera", f"Switched to IP cam {camera.source}")
 
 
-def set_camera_source(ip_digits):
-    global camera_source
-    try:
-        o = ip_digits.split('.')
-        if len(o) == 2 and all(i.isdigit() and 0 <= int(i) <= 255 for i in o):
-            camera_source = f"http://192.168.{ip_digits}:8080/video"
-            messagebox.showinfo("Camera", f"Switched to IP cam {camera_source}")
-        else:
-            raise ValueError
-    except ValueError:
+def add_camera_view(ip_digits):
+    url = ip_cam_url(ip_digits)
+    if url is None:
         messagebox.showerror("Input", "Enter last two octets like 0.212")
+        return
+    if len(cameras) >= MAX_VIEWS:
+        messagebox.showwarning("Camera", f"At most {MAX_VIEWS} cameras per mat")
+        return
+    view = add_view(url)
+    control.add_camera(view)
+    if camera.running:
+        view.start()
+    messagebox.showinfo("Camera", f"Added {view.camera_id}: {url}\n"
+                        f"Watch it at {broadcaster.stream_url(view.camera_id)}")
 
 
 def reset_to_device_camera():
-    global camera_source
-    camera_source = 0
+    camera.set_source(0)
     messagebox.showinfo("Camera", "Back to built‑in cam")
 
 
@@ -205,7 +133,8 @@ def show_about():
     msg = (
         "Real‑time BJJ vision demo\n\n"
         "∙ Raise 2/3/4 fingers → 2/3/4 points.\n"
-        "∙ Extend both arms sideways → STOP FIGHT signal."
+        "∙ Extend both arms sideways → STOP FIGHT signal.\n"
+        "∙ Press r for instant replay, [ / ] to change replay speed."
     )
     messagebox.showinfo("About", msg)
 
@@ -217,6 +146,21 @@ def open_github():
 # Build GUI
 # ------------------------------------------------------------------
 
+fusion.start()
+
+try:
+    control.start()
+    print(f"Control API listening on {control.url}")
+except OSError as e:
+    print(f"Control API disabled: {e}")
+
+try:
+    broadcaster.start()
+    for camera_id in cameras:
+        print(f"Live feed at {broadcaster.stream_url(camera_id)}")
+except OSError as e:
+    print(f"Live feed broadcast disabled: {e}")
+
 root = tk.Tk()
 root.title("BJJ Vision Scoring Demo")
 root.geometry("800x600")
@@ -242,6 +186,8 @@ ttk.Button(main_tab, text="Start Camera", command=start_camera).pack(pady=6)
 
 ttk.Button(main_tab, text="Stop Camera (q)", command=stop_camera).pack(pady=6)
 
+ttk.Button(main_tab, text="Instant Replay (r)", command=show_replay).pack(pady=6)
+
 ip_frame = ttk.Frame(main_tab)
 ip_frame.pack(pady=10)
 
@@ -251,6 +197,8 @@ entry.pack(side="left", padx=4)
 
 ttk.Button(ip_frame, text="Set", command=lambda: set_camera_source(entry.get())).pack(side="left")
 
+ttk.Button(ip_frame, text="Add View", command=lambda: add_camera_view(entry.get())).pack(side="left", padx=4)
+
 ttk.Button(main_tab, text="Use Device Cam", command=reset_to_device_camera).pack(pady=6)
 
 about_tab = ttk.Frame(notebook)
@@ -268,3 +216,12 @@ ttk.Button(contact_tab, text="GitHub Repository", command=open_github).pack(pady
 ttk.Button(root, text="Exit", command=root.quit).pack(side="bottom", pady=15)
 
 root.mainloop()
+
+for cam in cameras.values():
+    cam.close()
+control.stop()
+broadcaster.stop()
+fusion.stop()
+if inference is not None:
+    inference.stop()
+match_log.close()
@@ -0,0 +1,184 @@
+import collections
+import threading
+import time
+
+FUSION_FRAME_INTERVAL = 1 / 30   # one time step per camera frame
+SOURCE_TIMEOUT = 1.0             # a camera silent this long is treated as dropped out
+ALIGN_TOLERANCE = 0.2            # max capture-time gap between views fused together
+MIN_POSE_WEIGHT = 0.3            # summed visibility needed to call a pose
+MIN_HAND_SCORE = 0.5             # handedness score needed to count a hand
+
+Observation = collections.namedtuple("Observation", "camera timestamp pose weight gestures")
+FusedDecision = collections.namedtuple("FusedDecision", "timestamp pose confidence gestures sources match")
+
+# ------------------------------------------------------------------
+# Multi-view fusion
+# ------------------------------------------------------------------
+
+class MultiViewFusion:
+    """Combine per-camera pose/gesture results into one decision per time step.
+
+    Cameras call `submit()` with their capture timestamp (time.monotonic()).
+    Observations are binned into steps of `frame_interval`; a step is decided
+    as soon as every live camera has reported, or one frame interval after
+    its first observation arrived, whichever comes first, so fusion adds at
+    most one frame of latency on top of inference. A camera missing from a
+    step contributes its newest observation instead, if that was captured
+    within `tolerance` of the step, so a camera whose inference is slower
+    (or that shares a model pool and reports every other frame) is still
+    fused. Observations for an already decided step are counted in `late`
+    and only kept as their camera's newest. Cameras that stay silent for
+    `source_timeout` stop holding steps back.
+
+    Poses are combined by a visibility-weighted vote, so a side-on camera
+    that only sees one shoulder is outweighed by a camera facing the referee.
+    Gestures are voted per arm of the referee, weighted by hand score, so
+    the decision can drive a ScoringEngine. Given `scoring`, every decision
+    is fed to that engine, which then scores the whole mat once.
+    """
+
+    def __init__(self, frame_interval=FUSION_FRAME_INTERVAL, source_timeout=SOURCE_TIMEOUT,
+                 min_pose_weight=MIN_POSE_WEIGHT, min_hand_score=MIN_HAND_SCORE,
+                 tolerance=ALIGN_TOLERANCE, scoring=None):
+        self.frame_interval = frame_interval
+        self.source_timeout = source_timeout
+        self.tolerance = tolerance
+        self.min_pose_weight = min_pose_weight
+        self.min_hand_score = min_hand_score
+        self.scoring = scoring
+
+        self.latest = None
+        self.late = 0
+        self.decisions = 0
+
+        self._buckets = {}    # step → {camera: Observation}
+        self._deadlines = {}  # step → first arrival + frame_interval
+        self._last_seen = {}  # camera → monotonic time of last submit
+        self._newest = {}     # camera → Observation with the latest capture time
+        self._decided = -1    # highest step already decided
+        self._cond = threading.Condition()
+        self._listeners = []
+        self._running = False
+        self._thread = None
+
+    # -------------------- lifecycle -------------------------------
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="fusion")
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def add_listener(self, callback):
+        """`callback(decision)` runs on the fusion thread and must not block."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def live_sources(self, now=None):
+        now = time.monotonic() if now is None else now
+        return {c for c, seen in self._last_seen.items() if now - seen < self.source_timeout}
+
+    # -------------------- input -----------------------------------
+
+    def submit(self, camera, timestamp, pose, weight, gestures=()):
+        """Add one camera's result; `gestures` is a list of (side, label, hand score)."""
+        step = int(timestamp // self.frame_interval)
+        obs = Observation(camera, timestamp, pose, weight, tuple(gestures))
+        with self._cond:
+            now = time.monotonic()
+            self._last_seen[camera] = now
+            newest = self._newest.get(camera)
+            if newest is None or timestamp >= newest.timestamp:
+                self._newest[camera] = obs
+            if step <= self._decided:
+                self.late += 1
+                return
+            self._deadlines.setdefault(step, now + self.frame_interval)
+            views = self._buckets.setdefault(step, {})
+            # two frames from one camera in the same step: keep the clearer one
+            if camera not in views or weight >= views[camera].weight:
+                views[camera] = obs
+            self._cond.notify()
+
+    # -------------------- fusion thread ---------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                ready, wait = self._take_ready(time.monotonic())
+                if not ready:
+                    self._cond.wait(wait)
+                    continue
+            for step, views in ready:
+                decision = self._fuse(step, views)
+                if self.scoring is not None:
+                    self.scoring.update(decision.timestamp, decision.pose, decision.gestures)
+                    decision = decision._replace(match=self.scoring.snapshot())
+                self.latest = decision
+                self.decisions += 1
+                for callback in list(self._listeners):
+                    callback(decision)
+
+    def _take_ready(self, now):
+        """Pop the steps that can be decided now, oldest first."""
+        live = self.live_sources(now)
+        ready = []
+        wait = None
+        for step in sorted(self._buckets):
+            deadline = self._deadlines[step]
+            if now < deadline and not live <= self._buckets[step].keys():
+                wait = deadline - now
+                break
+            del self._deadlines[step]
+            ready.append((step, self._fill_in(step, self._buckets.pop(step), live)))
+            self._decided = step
+        return ready, wait
+
+    def _fill_in(self, step, views, live):
+        """Add the newest observation of live cameras missing from this step."""
+        centre = (step + 0.5) * self.frame_interval
+        for camera in live - views.keys():
+            obs = self._newest.get(camera)
+            if obs is not None and abs(obs.timestamp - centre) <= self.tolerance:
+                views[camera] = obs
+        return views
+
+    def _fuse(self, step, views):
+        votes = collections.Counter()
+        total = 0.0
+        for obs in views.values():
+            total += obs.weight
+            if obs.pose != "Unknown":
+                votes[obs.pose] += obs.weight
+
+        pose, confidence = "Unknown", 0.0
+        if votes:
+            best, weight = votes.most_common(1)[0]
+            if weight >= self.min_pose_weight:
+                pose, confidence = best, weight / total
+
+        # Every view names the referee's arm a hand is on, so hands are
+        # matched across views by side.
+        hand_votes = collections.defaultdict(collections.Counter)
+        for obs in views.values():
+            for side, gesture, score in obs.gestures:
+                if gesture != "Unknown" and score >= self.min_hand_score:
+                    hand_votes[side][gesture] += score
+        gestures = {side: votes.most_common(1)[0][0] for side, votes in sorted(hand_votes.items())}
+
+        return FusedDecision((step + 1) * self.frame_interval, pose, round(confidence, 3),
+                             gestures, sorted(views), None)
@@ -0,0 +1,196 @@
+"""Skip hand landmarking on frames where the pose rules out a referee signal.
+
+    python gating.py match.mp4      # report the saving and missed signals on a clip
+"""
+import argparse
+
+import cv2
+
+from recognition import (classify_hand_gesture, classify_pose, create_hands, create_pose,
+                         hand_sides, mp_pose)
+from scoring import ADVANTAGE_GESTURES, POINT_GESTURES, ScoringEngine
+
+# Heights are measured down from the shoulder in torso lengths (shoulder → hip).
+OPEN_BELOW_SHOULDER = 0.35   # wrist higher than this opens the gate at once
+CLOSE_BELOW_SHOULDER = 0.6   # wrist lower than this (and below the elbow) may close it
+RELEASE_FRAMES = 10          # consecutive lowered frames before the gate closes
+MIN_VISIBILITY = 0.5         # less visible wrists are treated as possibly raised
+
+_L = mp_pose.PoseLandmark
+ARMS = {
+    "left": (_L.LEFT_SHOULDER, _L.LEFT_ELBOW, _L.LEFT_WRIST),
+    "right": (_L.RIGHT_SHOULDER, _L.RIGHT_ELBOW, _L.RIGHT_WRIST),
+}
+
+# ------------------------------------------------------------------
+# Gate
+# ------------------------------------------------------------------
+
+class HandGate:
+    """Decide per frame, and per arm, whether hand landmarking is needed.
+
+    An arm opens as soon as its wrist comes up towards shoulder height or
+    above the elbow, and only closes after the wrist has been clearly low
+    for `release_frames` frames, so the start and end of a signal are kept.
+    When the pose is missing or the wrist is not visible the arm is kept
+    open: a wasted hand pass is cheaper than a missed score.
+    """
+
+    def __init__(self, open_below=OPEN_BELOW_SHOULDER, close_below=CLOSE_BELOW_SHOULDER,
+                 release_frames=RELEASE_FRAMES, min_visibility=MIN_VISIBILITY):
+        self.open_below = open_below
+        self.close_below = close_below
+        self.release_frames = release_frames
+        self.min_visibility = min_visibility
+        self._open = dict.fromkeys(ARMS, True)
+        self._lowered = dict.fromkeys(ARMS, 0)
+        self.active = False  # an arm is visibly raised right now
+        self.frames = 0
+        self.hand_runs = 0
+
+    def update(self, pose_landmarks):
+        """Return the set of arms ("left"/"right") that need hand landmarking."""
+        self.frames += 1
+        self.active = False
+        for side in ARMS:
+            state = self._arm_state(pose_landmarks, side)
+            self.active |= state == "raised"
+            if state in ("raised", "unknown"):
+                self._open[side] = True
+                self._lowered[side] = 0
+            elif state == "lowered":
+                self._lowered[side] += 1
+                if self._lowered[side] >= self.release_frames:
+                    self._open[side] = False
+            else:
+                # in between the two thresholds: keep the gate as it is,
+                # but the wrist is no longer clearly lowered
+                self._lowered[side] = 0
+
+        open_sides = {side for side, is_open in self._open.items() if is_open}
+        if open_sides:
+            self.hand_runs += 1
+        return open_sides
+
+    def _arm_state(self, pose_landmarks, side):
+        if not pose_landmarks:
+            return "unknown"
+        lm = pose_landmarks.landmark
+        shoulder, elbow, wrist = (lm[i] for i in ARMS[side])
+        if wrist.visibility < self.min_visibility:
+            return "unknown"
+
+        shoulder_y = (lm[_L.LEFT_SHOULDER].y + lm[_L.RIGHT_SHOULDER].y) / 2
+        hip_y = (lm[_L.LEFT_HIP].y + lm[_L.RIGHT_HIP].y) / 2
+        torso = max(hip_y - shoulder_y, 0.05)
+        drop = (wrist.y - shoulder.y) / torso  # image y grows downwards
+
+        if drop < self.open_below or wrist.y < elbow.y:
+            return "raised"
+        if drop > self.close_below:
+            return "lowered"
+        return "between"
+
+    @property
+    def invocation_rate(self):
+        return self.hand_runs / self.frames if self.frames else 1.0
+
+    def stats(self):
+        return {"frames": self.frames, "hand_runs": self.hand_runs,
+                "invocation_rate": round(self.invocation_rate, 3)}
+
+# ------------------------------------------------------------------
+# Offline check on a recorded match
+# ------------------------------------------------------------------
+
+def is_signal(gesture):
+    return gesture in POINT_GESTURES or gesture in ADVANTAGE_GESTURES
+
+
+def evaluate(path, gate=None):
+    """Run pose and hands on every frame of `path` and replay the gate decisions.
+
+    Compares the score events of an ungated and a gated ScoringEngine, and
+    counts frames where a scoring gesture appeared on an arm the gate had
+    closed.
+    """
+    gate = gate or HandGate()
+    pose, hands = create_pose(), create_hands()
+    full, gated = ScoringEngine(), ScoringEngine()
+    full_events, gated_events = [], []
+    signal_frames = missed_frames = 0
+
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    index = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        timestamp = index / fps
+        index += 1
+
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        pose_res = pose.process(rgb)
+        hand_res = hands.process(rgb)
+        open_sides = gate.update(pose_res.pose_landmarks)
+
+        current_pose = classify_pose(pose_res.pose_landmarks.landmark) if pose_res.pose_landmarks else "Unknown"
+        sides = hand_sides(pose_res.pose_landmarks, hand_res.multi_hand_landmarks,
+                           hand_res.multi_handedness)
+        by_side = {side: classify_hand_gesture(hlm)
+                   for side, hlm in zip(sides, hand_res.multi_hand_landmarks or ())}
+
+        for side, gesture in by_side.items():
+            if is_signal(gesture):
+                signal_frames += 1
+                missed_frames += side not in open_sides
+
+        full_events += full.update(timestamp, current_pose, by_side)
+        gated_events += gated.update(timestamp, current_pose,
+                                     {s: g for s, g in by_side.items() if s in open_sides})
+
+    cap.release()
+    pose.close()
+    hands.close()
+
+    def keys(events):
+        return [(e.kind, e.player, e.label) for e in events if e.kind != "stop_fight"]
+
+    remaining = keys(gated_events)
+    missed_events = 0
+    for key in keys(full_events):
+        if key in remaining:
+            remaining.remove(key)
+        else:
+            missed_events += 1
+
+    signals = len(keys(full_events))
+    return {
+        **gate.stats(),
+        "signal_frames": signal_frames,
+        "missed_signal_frames": missed_frames,
+        "missed_frame_rate": round(missed_frames / signal_frames, 3) if signal_frames else 0.0,
+        "signals": signals,
+        "missed_signals": missed_events,
+        "missed_signal_rate": round(missed_events / signals, 3) if signals else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check hand-gating savings on a recorded match.")
+    parser.add_argument("clip")
+    parser.add_argument("--release-frames", type=int, default=RELEASE_FRAMES)
+    args = parser.parse_args()
+
+    report = evaluate(args.clip, HandGate(release_frames=args.release_frames))
+    print(f"Hand model ran on {report['hand_runs']}/{report['frames']} frames "
+          f"({report['invocation_rate']:.0%}).")
+    print(f"Scoring gestures on a gated-off arm: {report['missed_signal_frames']}/{report['signal_frames']} "
+          f"frames ({report['missed_frame_rate']:.1%}).")
+    print(f"Score events lost to gating: {report['missed_signals']}/{report['signals']} "
+          f"({report['missed_signal_rate']:.1%}).")
+
+
+if __name__ == "__main__":
+    main()
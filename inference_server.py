@@ -0,0 +1,191 @@
+import collections
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from recognition import create_hands, create_pose, run_models
+
+QUEUE_SIZE = 2           # requests kept per camera; older ones are dropped
+MAX_WAIT = 0.25          # seconds before a normal camera jumps the priority queue
+LATENCY_SMOOTHING = 0.1
+
+# Scheduling levels passed to set_priority(); higher is served first.
+PRIORITY_IDLE = 0        # quiet mat
+PRIORITY_ACTIVE = 1      # athletes moving: an exchange is in progress
+PRIORITY_SIGNAL = 2      # referee arm raised or a score signal pending
+
+
+def default_instances():
+    """One pose+hands pair per two cores; each graph already uses a few threads."""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+# ------------------------------------------------------------------
+# Per-camera bookkeeping
+# ------------------------------------------------------------------
+
+_Request = collections.namedtuple("_Request", "image gate future submitted")
+
+
+class _Camera:
+    def __init__(self, camera_id):
+        self.camera_id = camera_id
+        self.queue = collections.deque()
+        self.priority = PRIORITY_IDLE
+        self.busy = False       # a model instance is working on this camera
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.cancelled = 0      # withdrawn by the camera before they ran
+        self.latency = None     # smoothed submit → result, seconds
+        self.wait = None        # smoothed submit → start, seconds
+
+    def stats(self):
+        def ms(value):
+            return None if value is None else round(value * 1000, 1)
+        return {"queue_depth": len(self.queue), "priority": self.priority,
+                "submitted": self.submitted, "completed": self.completed, "dropped": self.dropped,
+                "cancelled": self.cancelled,
+                "latency_ms": ms(self.latency), "wait_ms": ms(self.wait)}
+
+
+def _smooth(previous, value):
+    return value if previous is None else previous + LATENCY_SMOOTHING * (value - previous)
+
+# ------------------------------------------------------------------
+# Shared model pool
+# ------------------------------------------------------------------
+
+class InferenceServer:
+    """A pool of pose+hands graphs shared by many camera workers.
+
+    `submit()` returns a Future of a recognition.ModelResult. Cameras are
+    served round-robin within the highest waiting `set_priority()` level
+    (a referee signal, then an active exchange, then quiet mats); a camera
+    whose oldest request has waited `max_wait` is raised to the top level
+    so quiet mats are never starved. A camera is never processed by two
+    instances at once, so its results (and its HandGate) stay in frame order.
+
+    The graphs run in static-image mode: every instance alternates between
+    cameras, and a tracking graph would carry one camera's state into the
+    next (resetting it instead costs more than a fresh detection). That
+    makes each frame dearer than on a camera's own tracking graphs, so the
+    pool pays off when there are more cameras than instances. MediaPipe
+    processes one image per call, so requests are not batched; throughput
+    comes from running the instances in parallel.
+    """
+
+    def __init__(self, instances=None, queue_size=QUEUE_SIZE, max_wait=MAX_WAIT):
+        self.instances = instances or default_instances()
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self._cameras = collections.OrderedDict()  # round-robin order
+        self._busy = 0
+        self._cond = threading.Condition()
+        self._running = True
+        self._threads = [threading.Thread(target=self._serve, daemon=True, name=f"inference-{i}")
+                         for i in range(self.instances)]
+        for thread in self._threads:
+            thread.start()
+
+    # -------------------- client side -----------------------------
+
+    def submit(self, camera_id, image, gate=None):
+        """Queue an RGB frame; the camera's HandGate runs on the model thread."""
+        future = Future()
+        with self._cond:
+            if not self._running:
+                future.set_exception(RuntimeError("inference server stopped"))
+                return future
+            camera = self._cameras.get(camera_id)
+            if camera is None:
+                camera = self._cameras[camera_id] = _Camera(camera_id)
+            if len(camera.queue) >= self.queue_size:
+                camera.queue.popleft().future.cancel()
+                camera.dropped += 1
+            camera.queue.append(_Request(image, gate, future, time.monotonic()))
+            camera.submitted += 1
+            self._cond.notify_all()
+        return future
+
+    def set_priority(self, camera_id, level):
+        """Set the camera's scheduling level (PRIORITY_IDLE … PRIORITY_SIGNAL)."""
+        with self._cond:
+            camera = self._cameras.get(camera_id)
+            if camera is None:
+                camera = self._cameras[camera_id] = _Camera(camera_id)
+            camera.priority = int(level)
+
+    def stats(self):
+        with self._cond:
+            return {"instances": self.instances, "busy": self._busy,
+                    "cameras": {cid: cam.stats() for cid, cam in self._cameras.items()}}
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._running = False
+            for camera in self._cameras.values():
+                while camera.queue:
+                    camera.queue.popleft().future.cancel()
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    # -------------------- scheduling ------------------------------
+
+    def _pick(self, now):
+        """Next camera to serve, or None if nothing is waiting."""
+        waiting = [c for c in self._cameras.values() if c.queue and not c.busy]
+        if not waiting:
+            return None
+
+        def level(c):
+            return PRIORITY_SIGNAL if now - c.queue[0].submitted >= self.max_wait else c.priority
+
+        top = max(level(c) for c in waiting)
+        camera = next(c for c in waiting if level(c) == top)  # first in round-robin order
+        self._cameras.move_to_end(camera.camera_id)
+        return camera
+
+    def _serve(self):
+        pose = hands = None
+        try:
+            while True:
+                with self._cond:
+                    camera = None
+                    while self._running:
+                        camera = self._pick(time.monotonic())
+                        if camera is not None:
+                            break
+                        self._cond.wait(self.max_wait)
+                    if camera is None:
+                        return
+                    request = camera.queue.popleft()
+                    camera.busy = True
+                    self._busy += 1
+
+                started = time.monotonic()
+                ran = request.future.set_running_or_notify_cancel()
+                if ran:
+                    if pose is None:  # created lazily so idle instances cost nothing
+                        pose, hands = create_pose(static=True), create_hands(static=True)
+                    try:
+                        request.future.set_result(run_models(request.image, pose, hands, request.gate))
+                    except Exception as e:
+                        request.future.set_exception(e)
+
+                with self._cond:
+                    done = time.monotonic()
+                    camera.busy = False
+                    if ran:  # cancelled requests say nothing about latency
+                        camera.completed += 1
+                        camera.wait = _smooth(camera.wait, started - request.submitted)
+                        camera.latency = _smooth(camera.latency, done - request.submitted)
+                    else:
+                        camera.cancelled += 1
+                    self._busy -= 1
+                    self._cond.notify_all()
+        finally:
+            if pose is not None:
+                pose.close()
+                hands.close()
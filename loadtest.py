@@ -0,0 +1,298 @@
+"""Find how many IP-camera streams this machine can recognise in real time.
+
+Starts N local MJPEG servers that look like the phone app's
+http://…:8080/video endpoint, replays a recorded clip on each of them with
+optional jitter, stalls and disconnects, points a headless CameraWorker at
+every stream and reports FPS, latency, dropped frames and CPU/RSS as N grows.
+
+    python loadtest.py match.mp4 --streams 1 2 4 8 --fps 30 --duration 20
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+from camera_worker import CameraWorker
+from inference_server import InferenceServer
+
+STAMP_BITS = 16    # frame index barcode in the top-left corner
+STAMP_BLOCK = 16   # pixels per bit; big enough to survive JPEG
+BOUNDARY = b"frame"
+
+# ------------------------------------------------------------------
+# Clip preparation
+# ------------------------------------------------------------------
+
+def stamp_frame(frame, index):
+    for bit in range(STAMP_BITS):
+        value = 255 if index >> bit & 1 else 0
+        frame[:STAMP_BLOCK, bit * STAMP_BLOCK:(bit + 1) * STAMP_BLOCK] = value
+
+
+def read_stamp(frame):
+    """Return the clip index stamped by stamp_frame (call before annotating)."""
+    centre = STAMP_BLOCK // 2
+    pixels = frame[centre, centre:STAMP_BITS * STAMP_BLOCK:STAMP_BLOCK]
+    bits = pixels.mean(axis=1) > 127
+    return sum(1 << i for i, bit in enumerate(bits) if bit)
+
+
+def load_clip(path, width=None, quality=85, limit=1 << STAMP_BITS):
+    """Read a clip once and return its frames as stamped JPEG bytes."""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if width and frame.shape[1] != width:
+            height = round(frame.shape[0] * width / frame.shape[1])
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        stamp_frame(frame, len(frames))
+        ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            frames.append(jpeg.tobytes())
+    cap.release()
+    if not frames:
+        raise SystemExit(f"Could not read any frames from {path!r}")
+    return frames
+
+# ------------------------------------------------------------------
+# Simulated IP cameras (run in a child process)
+# ------------------------------------------------------------------
+
+class _ClipHandler(BaseHTTPRequestHandler):
+    """Streams the clip like a live camera: late frames are skipped, not queued."""
+
+    def do_GET(self):
+        cam = self.server
+        if self.path != "/video":
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY.decode()}")
+        self.end_headers()
+
+        interval = 1.0 / cam.fps
+        next_time = time.monotonic()
+        if cam.last_sent:  # a live camera kept running while we were disconnected
+            cam.position += int((next_time - cam.last_sent) / interval)
+        try:
+            while not cam.stopping.is_set():
+                if random.random() < cam.disconnect_rate * interval:
+                    cam.disconnects += 1
+                    return
+                if random.random() < cam.stall_rate * interval:
+                    cam.stalls += 1
+                    time.sleep(cam.stall_time)
+
+                now = time.monotonic()
+                behind = int((now - next_time) / interval)
+                if behind > 0:  # sender fell behind (slow reader or stall)
+                    cam.position += behind
+                    next_time += behind * interval
+
+                index = cam.position % len(cam.frames)
+                jpeg = cam.frames[index]
+                cam.send_times[cam.offset + index] = cam.last_sent = time.monotonic()
+                self.wfile.write(b"--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
+                                 % (BOUNDARY, len(jpeg)))
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                cam.position += 1
+
+                next_time += interval * (1 + random.uniform(-cam.jitter, cam.jitter))
+                time.sleep(max(0.0, next_time - time.monotonic()))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_clips(frames, ports, send_times, options, ready, stop):
+    """Child-process entry point: one simulated camera per port."""
+    servers = []
+    for n, port in enumerate(ports):
+        server = ThreadingHTTPServer(("127.0.0.1", port), _ClipHandler)
+        server.daemon_threads = True
+        server.frames = frames
+        server.offset = n * len(frames)
+        server.send_times = send_times
+        server.position = 0
+        server.last_sent = 0.0
+        server.stalls = server.disconnects = 0
+        server.stopping = stop
+        for key, value in options.items():
+            setattr(server, key, value)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    ready.set()
+    stop.wait()
+    for server in servers:
+        server.shutdown()
+
+# ------------------------------------------------------------------
+# Instrumented recogniser
+# ------------------------------------------------------------------
+
+class LoadTestWorker(CameraWorker):
+    """Headless CameraWorker that records per-frame timing for one stream."""
+
+    def __init__(self, stream, source, send_times, clip_len, inference=None):
+        super().__init__(f"load{stream}", source=source, show=False, inference=inference)
+        self.offset = stream * clip_len
+        self.clip_len = clip_len
+        self.send_times = send_times
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.dropped = 0
+        self.latencies = []
+        self._last_index = None
+
+    def _handle(self, frame, timestamp, result):
+        index = read_stamp(frame)
+        super()._handle(frame, timestamp, result)
+
+        sent = self.send_times[self.offset + index % self.clip_len]
+        latency = time.monotonic() - sent
+        if 0 < latency < 10:
+            self.latencies.append(latency)
+        if self._last_index is not None:
+            self.dropped += (index - self._last_index - 1) % self.clip_len
+        self._last_index = index
+        self.frames += 1
+
+# ------------------------------------------------------------------
+# Measurement
+# ------------------------------------------------------------------
+
+def rss_mb():
+    """Resident memory of this process in MB, or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, Linux units
+    except ImportError:
+        return None
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_step(n, frames, args):
+    """Run N streams for args.duration seconds and print one table block."""
+    ports = [args.base_port + i for i in range(n)]
+    send_times = multiprocessing.Array("d", n * len(frames), lock=False)
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    options = {"fps": args.fps, "jitter": args.jitter, "stall_rate": args.stall_rate,
+               "stall_time": args.stall_time, "disconnect_rate": args.disconnect_rate}
+    servers = multiprocessing.Process(target=serve_clips, daemon=True,
+                                      args=(frames, ports, send_times, options, ready, stop))
+    servers.start()
+    ready.wait()
+
+    inference = InferenceServer(args.shared_models) if args.shared_models else None
+    workers = [LoadTestWorker(i, f"http://127.0.0.1:{port}/video", send_times, len(frames), inference)
+               for i, port in enumerate(ports)]
+    rss_before = rss_mb()
+    for worker in workers:
+        worker.start()
+    time.sleep(args.warmup)  # model start-up is not part of the steady state
+
+    for worker in workers:
+        worker.reset_stats()
+        worker.reconnects = 0
+    wall, cpu = time.monotonic(), time.process_time()
+    time.sleep(args.duration)
+    wall, cpu = time.monotonic() - wall, time.process_time() - cpu
+    rss = rss_mb()
+
+    mode = f"{args.shared_models} shared model instance(s)" if inference else "own models per stream"
+    print(f"\n== {n} stream(s) @ {args.fps} fps target, {mode} ==")
+    print(f"{'stream':>8} {'fps':>7} {'p50 ms':>8} {'p95 ms':>8} {'dropped':>8} "
+          f"{'reconn':>7}  error")
+    total_fps = 0.0
+    for worker in workers:
+        fps = worker.frames / wall
+        total_fps += fps
+        print(f"{worker.camera_id:>8} {fps:7.1f} {percentile(worker.latencies, .5) * 1000:8.0f} "
+              f"{percentile(worker.latencies, .95) * 1000:8.0f} {worker.dropped:8d} "
+              f"{worker.reconnects:7d}  {worker.error or ''}")
+
+    rss_text = "n/a"
+    if rss is not None:
+        per_stream = (rss - rss_before) / n if rss_before is not None else float("nan")
+        rss_text = f"{rss:.0f} MB ({per_stream:+.0f} MB/stream)"
+    # MediaPipe runs inference on its own threads, so CPU is only
+    # measurable per process; the simulated cameras live in another one.
+    print(f"{'total':>8} {total_fps:7.1f} fps | process CPU {cpu / wall * 100:.0f}% "
+          f"({cpu / wall * 100 / n:.0f}%/stream) | RSS {rss_text}")
+
+    if inference is not None:
+        for camera, stats in inference.stats()["cameras"].items():
+            print(f"{camera:>8} server latency {stats['latency_ms']} ms, wait {stats['wait_ms']} ms, "
+                  f"queue {stats['queue_depth']}, dropped {stats['dropped']}")
+
+    for worker in workers:
+        worker.close()  # frees the replay buffer before the next step measures RSS
+    if inference is not None:
+        inference.stop()
+    stop.set()
+    servers.join(5)
+
+    realtime = all(w.frames / wall >= args.fps * args.realtime for w in workers)
+    return realtime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clip", help="recorded match clip to replay; latency is only "
+                        "measured correctly while it stays below the clip length")
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 2, 4],
+                        help="stream counts to ramp through (default: 1 2 4)")
+    parser.add_argument("--fps", type=float, default=30.0, help="frame rate of each simulated camera")
+    parser.add_argument("--width", type=int, default=640, help="resize the clip to this width")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds measured per step")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds ignored at the start of each step")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="random ± fraction applied to every frame interval, e.g. 0.2")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="stalls per second per stream")
+    parser.add_argument("--stall-time", type=float, default=1.0, help="length of each stall in seconds")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0,
+                        help="dropped connections per second per stream")
+    parser.add_argument("--realtime", type=float, default=0.9,
+                        help="fraction of --fps every stream must sustain to count as keeping up")
+    parser.add_argument("--shared-models", type=int, default=0, metavar="N",
+                        help="share N model instances between all streams through an InferenceServer")
+    parser.add_argument("--base-port", type=int, default=9100)
+    args = parser.parse_args()
+
+    frames = load_clip(args.clip, args.width)
+    print(f"Loaded {len(frames)} frames from {args.clip}")
+
+    capacity = 0
+    for n in args.streams:
+        if not run_step(n, frames, args):
+            break
+        capacity = n
+    print(f"\nSustained {args.realtime:.0%} of {args.fps:g} fps on up to {capacity} stream(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,82 @@
 import cv2
-import mediapipe as mp
 import time
 
+from recognition import (classify_hand_gesture, classify_pose, create_hands, create_pose,
+                         hand_sides, mp_draw, mp_hands, mp_pose)
+from scoring import MatchLog, ScoringEngine
+
 class BJJScoreKeeper:
-    def __init__(self):
-        self.player1_score = 0
-        self.player2_score = 0
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands()
-        self.mp_draw = mp.solutions.drawing_utils
-
-    def detect_gesture(self, frame):
+    def __init__(self, log_path=None):
+        self.pose = create_pose()
+        self.hands = create_hands()
+        self.mp_hands = mp_hands
+        self.mp_draw = mp_draw
+        self.log = MatchLog(log_path)
+        self.engine = ScoringEngine(log=self.log)
+        self.current_pose = "Unknown"
+        self.gestures_by_side = {}
+
+    @property
+    def player1_score(self):
+        return self.engine.scores[1]
+
+    @property
+    def player2_score(self):
+        return self.engine.scores[2]
+
+    def detect_gesture(self, frame, timestamp=None):
+        """Recognise the referee signal in this frame and feed the scoring engine."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
         # Convert BGR to RGB
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        pose_results = self.pose.process(rgb_frame)
+        pose_landmarks = pose_results.pose_landmarks
+        self.current_pose = classify_pose(pose_landmarks.landmark) if pose_landmarks else "Unknown"
+        if pose_landmarks:
+            self.mp_draw.draw_landmarks(frame, pose_landmarks, mp_pose.POSE_CONNECTIONS)
+
         results = self.hands.process(rgb_frame)
-        
+        self.gestures_by_side = {}
         if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
+            sides = hand_sides(pose_landmarks, results.multi_hand_landmarks, results.multi_handedness)
+            for side, hand_landmarks in zip(sides, results.multi_hand_landmarks):
                 # Draw landmarks
-                self.mp_draw.draw_landmarks(frame, hand_landmarks, 
+                self.mp_draw.draw_landmarks(frame, hand_landmarks,
                                          self.mp_hands.HAND_CONNECTIONS)
-                # Here you would add gesture recognition logic
-                # Example: detect if fingers are raised in specific patterns
-                
+                self.gestures_by_side[side] = classify_hand_gesture(hand_landmarks)
+
+        return self.engine.update(timestamp, self.current_pose, self.gestures_by_side)
+
     def run(self):
         cap = cv2.VideoCapture(0)
-        
+
         while cap.isOpened():
             success, frame = cap.read()
             if not success:
                 continue
-                
+
             self.detect_gesture(frame)
-            
+
             # Display scores
-            cv2.putText(frame, f"Player 1: {self.player1_score}", (10, 30), 
+            adv = self.engine.advantages
+            cv2.putText(frame, f"Player 1: {self.player1_score}  Adv: {adv[1]}", (10, 30),
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            cv2.putText(frame, f"Player 2: {self.player2_score}", (10, 70),
+            cv2.putText(frame, f"Player 2: {self.player2_score}  Adv: {adv[2]}", (10, 70),
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            
+            if self.engine.stop_fight:
+                h, w, _ = frame.shape
+                cv2.putText(frame, "STOP FIGHT", (int(w*0.15), int(h*0.55)),
+                           cv2.FONT_HERSHEY_DUPLEX, 2.5, (0, 0, 255), 5)
+
             cv2.imshow('BJJ Score Keeper', frame)
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
-                
+
         cap.release()
         cv2.destroyAllWindows()
+        self.log.close()
 
 if __name__ == "__main__":
     scorekeeper = BJJScoreKeeper()
-    scorekeeper.run()
\ No newline at end of file
+    scorekeeper.run()
@@ -0,0 +1,123 @@
+import collections
+
+import mediapipe as mp
+
+# ------------------------------------------------------------------
+# MediaPipe initialisation
+# ------------------------------------------------------------------
+
+mp_pose = mp.solutions.pose
+mp_hands = mp.solutions.hands
+mp_draw = mp.solutions.drawing_utils
+
+STOP_FIGHT_POSES = {"Arms Extended", "T-pose"}
+
+
+def create_pose(static=False):
+    """New Pose graph. Tracking graphs keep per-stream state, so each camera
+    needs its own; `static=True` graphs can be shared between cameras."""
+    return mp_pose.Pose(static_image_mode=static,
+                        min_detection_confidence=0.5,
+                        min_tracking_confidence=0.5)
+
+
+def create_hands(static=False):
+    """New Hands graph; see create_pose for `static`."""
+    return mp_hands.Hands(static_image_mode=static,
+                          max_num_hands=2,
+                          min_detection_confidence=0.5,
+                          min_tracking_confidence=0.5)
+
+ModelResult = collections.namedtuple("ModelResult", "pose_landmarks hand_landmarks handedness open_sides")
+
+
+def run_models(rgb, pose, hands, gate=None):
+    """Run the pose graph, then the hand graph unless `gate` rules hands out.
+
+    `open_sides` is the set of arms the gate left open, or None without a gate.
+    """
+    pose_landmarks = pose.process(rgb).pose_landmarks
+    open_sides = gate.update(pose_landmarks) if gate is not None else None
+    hand_landmarks, handedness = [], []
+    if open_sides is None or open_sides:
+        hand_res = hands.process(rgb)
+        hand_landmarks = hand_res.multi_hand_landmarks or []
+        handedness = hand_res.multi_handedness or []
+    return ModelResult(pose_landmarks, hand_landmarks, handedness, open_sides)
+
+# ------------------------------------------------------------------
+# Hand‑gesture utilities
+# ------------------------------------------------------------------
+
+def count_extended_fingers(hand_landmarks):
+    """Return the number of raised fingers (index→pinky)."""
+    finger_tips = [8, 12, 16, 20]
+    return sum(1 for tip in finger_tips
+               if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y)
+
+
+def classify_hand_gesture(hand_landmarks):
+    """Map finger‑count or classic shapes → label/string."""
+    fingers_up = count_extended_fingers(hand_landmarks)
+    if fingers_up in (2, 3, 4):
+        return f"{fingers_up} Points"
+
+    # fallback mini‑set of gestures
+    FINGER_TIPS = [4, 8, 12, 16, 20]
+    states = [int(hand_landmarks.landmark[t].y < hand_landmarks.landmark[t-2].y)
+              for t in FINGER_TIPS]
+    if states == [1, 0, 0, 0, 0]:
+        return "Thumb Up"
+    if states == [1, 1, 1, 1, 1]:
+        return "All Fingers Extended"
+    return "Unknown"
+
+# ------------------------------------------------------------------
+# Pose utilities
+# ------------------------------------------------------------------
+
+def classify_pose(lm):
+    ls, rs = lm[mp_pose.PoseLandmark.LEFT_SHOULDER], lm[mp_pose.PoseLandmark.RIGHT_SHOULDER]
+    lw, rw = lm[mp_pose.PoseLandmark.LEFT_WRIST], lm[mp_pose.PoseLandmark.RIGHT_WRIST]
+
+    if abs(ls.y - rs.y) < 0.1:  # shoulders roughly level
+        # wrists roughly level w/ shoulders → classic T
+        if abs(lw.y - ls.y) < 0.1 and abs(rw.y - rs.y) < 0.1:
+            return "T-pose"
+        # wrists far left/right of shoulders → arms straight out
+        if lw.x < ls.x and rw.x > rs.x:
+            return "Arms Extended"
+        return "Standing Upright"
+    return "Unknown"
+
+
+def pose_visibility(lm):
+    """Mean visibility of the landmarks classify_pose relies on (0‥1).
+
+    Drops when the referee turns side-on and the far arm is hidden, so it
+    doubles as a confidence weight for the pose label of this view.
+    """
+    keys = (mp_pose.PoseLandmark.LEFT_SHOULDER, mp_pose.PoseLandmark.RIGHT_SHOULDER,
+            mp_pose.PoseLandmark.LEFT_WRIST, mp_pose.PoseLandmark.RIGHT_WRIST)
+    return sum(lm[k].visibility for k in keys) / len(keys)
+
+
+def hand_sides(pose_landmarks, multi_hand_landmarks, multi_handedness):
+    """Which of the referee's arms ("left"/"right") each detected hand is on.
+
+    Matches every hand to the nearer pose wrist; without a pose it falls
+    back to MediaPipe's handedness, which assumes a mirrored (selfie) image.
+    """
+    sides = []
+    for hlm, handedness in zip(multi_hand_landmarks or (), multi_handedness or ()):
+        if pose_landmarks:
+            wrist = hlm.landmark[mp_hands.HandLandmark.WRIST]
+            lw = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_WRIST]
+            rw = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_WRIST]
+            to_left = (wrist.x - lw.x) ** 2 + (wrist.y - lw.y) ** 2
+            to_right = (wrist.x - rw.x) ** 2 + (wrist.y - rw.y) ** 2
+            sides.append("left" if to_left <= to_right else "right")
+        else:
+            label = handedness.classification[0].label
+            sides.append("right" if label == "Left" else "left")
+    return sides
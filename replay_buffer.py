@@ -0,0 +1,196 @@
+import collections
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# ------------------------------------------------------------------
+# Defaults
+# ------------------------------------------------------------------
+
+REPLAY_SECONDS = 10                   # how much history each camera keeps
+REPLAY_MAX_BYTES = 64 * 1024 * 1024   # hard cap on encoded frames per camera
+REPLAY_JPEG_QUALITY = 80
+REPLAY_WINDOW = "Instant Replay"
+REPLAY_SPEEDS = (0.25, 0.5, 1.0, 2.0)
+
+ReplayFrame = collections.namedtuple(
+    "ReplayFrame",
+    "timestamp jpeg pose_landmarks hand_landmarks pose gestures")
+
+# ------------------------------------------------------------------
+# Ring buffer
+# ------------------------------------------------------------------
+
+class ReplayBuffer:
+    """Last few seconds of one camera, stored as JPEG plus the matching results."""
+
+    def __init__(self, camera_id, seconds=REPLAY_SECONDS, max_bytes=REPLAY_MAX_BYTES,
+                 quality=REPLAY_JPEG_QUALITY, queue_size=8):
+        self.camera_id = camera_id
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.dropped = 0  # frames skipped because the encoder fell behind
+
+        self._frames = collections.deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._pending = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._encoder = threading.Thread(target=self._encode_loop, daemon=True)
+        self._encoder.start()
+
+    def push(self, frame, timestamp, pose_landmarks=None, hand_landmarks=(),
+             pose="Unknown", gestures=()):
+        """Hand a frame to the encoder thread; never blocks the video loop."""
+        if self._closed:
+            return
+        item = (timestamp, frame, pose_landmarks, tuple(hand_landmarks),
+                pose, tuple(gestures))
+        try:
+            self._pending.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def snapshot(self, seconds=None):
+        """Return the buffered frames (oldest first), optionally only the last `seconds`."""
+        with self._lock:
+            frames = list(self._frames)
+        if seconds is not None and frames:
+            start = frames[-1].timestamp - seconds
+            frames = [f for f in frames if f.timestamp >= start]
+        return frames
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        """Stop the encoder thread once the queued frames are written and free them."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pending.put(None)
+        self._encoder.join()
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def _encode_loop(self):
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            timestamp, frame, *results = item
+            ok, jpeg = cv2.imencode(".jpg", frame, params)
+            if ok:
+                self._append(ReplayFrame(timestamp, jpeg.tobytes(), *results))
+
+    def _append(self, item):
+        with self._lock:
+            self._frames.append(item)
+            self._bytes += len(item.jpeg)
+            horizon = item.timestamp - self.seconds
+            while self._frames and (self._bytes > self.max_bytes
+                                    or self._frames[0].timestamp < horizon):
+                self._bytes -= len(self._frames.popleft().jpeg)
+
+# ------------------------------------------------------------------
+# Playback
+# ------------------------------------------------------------------
+
+class ReplayPlayer:
+    """Decode a replay on a background thread and show it in a second window.
+
+    Playback is paced on its own thread, but `show()` must be called from
+    the thread that owns the live window so all HighGUI calls stay there.
+    """
+
+    def __init__(self, window=REPLAY_WINDOW, speed=1.0):
+        self.window = window
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._frame = None
+        self._window_open = False
+        self._finished = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def playing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def play(self, frames):
+        """Start playing `frames` from the beginning, replacing any running replay."""
+        self.stop()
+        if not frames:
+            return
+        self._stop = threading.Event()
+        self._finished = False
+        self._thread = threading.Thread(target=self._play_loop,
+                                        args=(frames, self._stop), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        self._finished = True
+
+    def faster(self):
+        faster = [s for s in REPLAY_SPEEDS if s > self.speed]
+        self.speed = faster[0] if faster else self.speed
+
+    def slower(self):
+        slower = [s for s in REPLAY_SPEEDS if s < self.speed]
+        self.speed = slower[-1] if slower else self.speed
+
+    def show(self):
+        """Push the latest decoded frame to the replay window; cheap when idle."""
+        with self._lock:
+            frame, self._frame = self._frame, None
+        if frame is not None:
+            cv2.imshow(self.window, frame)
+            self._window_open = True
+        elif self._finished and self._window_open:
+            cv2.destroyWindow(self.window)
+            self._window_open = False
+
+    def _play_loop(self, frames, stop):
+        t0 = frames[0].timestamp
+        duration = frames[-1].timestamp - t0
+        position = 0.0
+        last = time.monotonic()
+
+        for item in frames:
+            # Advance a media clock so speed changes take effect mid-replay.
+            while not stop.is_set():
+                now = time.monotonic()
+                position += (now - last) * self.speed
+                last = now
+                wait = (item.timestamp - t0) - position
+                if wait <= 0:
+                    break
+                stop.wait(min(wait / self.speed, 0.05))
+            if stop.is_set():
+                return
+
+            image = cv2.imdecode(np.frombuffer(item.jpeg, np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                continue
+            remaining = duration - (item.timestamp - t0)
+            cv2.putText(image, f"REPLAY x{self.speed:g}  -{remaining:.1f}s", (10, image.shape[0] - 20),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+            with self._lock:
+                self._frame = image
+
+        self._finished = True
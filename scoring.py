@@ -0,0 +1,181 @@
+import collections
+import datetime
+import json
+import math
+import os
+import queue
+import threading
+import time
+
+from recognition import STOP_FIGHT_POSES
+
+# ------------------------------------------------------------------
+# Signal vocabulary
+# ------------------------------------------------------------------
+
+POINT_GESTURES = {"2 Points": 2, "3 Points": 3, "4 Points": 4}
+ADVANTAGE_GESTURES = {"All Fingers Extended"}   # open hand
+STOP_FIGHT = "STOP FIGHT"
+PLAYER_BY_SIDE = {"left": 1, "right": 2}       # referee's arm → athlete it points at
+
+WINDOW_FRAMES = 15      # ~0.5 s of frames at 30 fps
+VOTE_FRACTION = 0.6     # share of the window a label needs to count as shown
+HOLD_SECONDS = 0.5      # how long it must stay shown before it is scored
+
+ScoreEvent = collections.namedtuple("ScoreEvent", "timestamp kind player points label")
+
+MATCH_LOG_DIR = "match_logs"
+
+# ------------------------------------------------------------------
+# Debouncing
+# ------------------------------------------------------------------
+
+class SignalVote:
+    """Sliding-window majority vote with a hold timer for one signal channel.
+
+    Keeps a running count per label, so each update only touches the label
+    entering and the label leaving the window: constant work per frame.
+    A label fires once when it has held the majority for `hold` seconds and
+    can only fire again after it has lost the majority.
+    """
+
+    def __init__(self, window=WINDOW_FRAMES, fraction=VOTE_FRACTION, hold=HOLD_SECONDS):
+        if fraction <= 0.5:
+            raise ValueError("fraction must be above 0.5 so only one label can win")
+        self.labels = collections.deque(maxlen=window)
+        self.counts = collections.Counter()
+        self.quorum = math.ceil(fraction * window)
+        self.hold = hold
+        self.majority = None
+        self.since = None
+        self.fired = False
+
+    @property
+    def pending(self):
+        """True while a signal is being shown but has not been scored yet."""
+        return self.majority is not None and not self.fired
+
+    def update(self, label, timestamp):
+        """Add this frame's label (None = no signal); returns a label when it fires."""
+        if len(self.labels) == self.labels.maxlen:
+            self.counts[self.labels[0]] -= 1
+        self.labels.append(label)
+        self.counts[label] += 1
+
+        if self.counts[label] >= self.quorum:
+            majority = label
+        elif self.majority is not None and self.counts[self.majority] >= self.quorum:
+            majority = self.majority
+        else:
+            majority = None
+
+        if majority != self.majority:
+            self.majority, self.since, self.fired = majority, timestamp, False
+        if self.pending and timestamp - self.since >= self.hold:
+            self.fired = True
+            return majority
+        return None
+
+# ------------------------------------------------------------------
+# Scoring engine
+# ------------------------------------------------------------------
+
+class ScoringEngine:
+    """Turn noisy per-frame pose and hand labels into debounced score events.
+
+    Feed `update()` once per frame with the referee pose and the gesture
+    seen on each arm; it returns the ScoreEvents that fired on this frame
+    and keeps the running score and advantages.
+    """
+
+    def __init__(self, window=WINDOW_FRAMES, fraction=VOTE_FRACTION, hold=HOLD_SECONDS, log=None):
+        self.stop_vote = SignalVote(window, fraction, hold)
+        self.hand_votes = {side: SignalVote(window, fraction, hold) for side in PLAYER_BY_SIDE}
+        self.scores = {1: 0, 2: 0}
+        self.advantages = {1: 0, 2: 0}
+        self.log = log
+        if log is not None:
+            log.write({"event": "match_start"})
+
+    @property
+    def stop_fight(self):
+        return self.stop_vote.majority == STOP_FIGHT
+
+    @property
+    def pending(self):
+        """A signal is in progress on some channel but has not fired yet."""
+        return self.stop_vote.pending or any(v.pending for v in self.hand_votes.values())
+
+    def update(self, timestamp, pose, gestures_by_side):
+        """`gestures_by_side` maps "left"/"right" to the gesture on that arm."""
+        events = []
+        if self.stop_vote.update(STOP_FIGHT if pose in STOP_FIGHT_POSES else None, timestamp):
+            events.append(ScoreEvent(timestamp, "stop_fight", None, 0, STOP_FIGHT))
+
+        for side, vote in self.hand_votes.items():
+            gesture = gestures_by_side.get(side)
+            if gesture not in POINT_GESTURES and gesture not in ADVANTAGE_GESTURES:
+                gesture = None
+            fired = vote.update(gesture, timestamp)
+            if fired is None:
+                continue
+            player = PLAYER_BY_SIDE[side]
+            if fired in POINT_GESTURES:
+                self.scores[player] += POINT_GESTURES[fired]
+                events.append(ScoreEvent(timestamp, "points", player, POINT_GESTURES[fired], fired))
+            else:
+                self.advantages[player] += 1
+                events.append(ScoreEvent(timestamp, "advantage", player, 0, fired))
+
+        if events and self.log is not None:
+            for event in events:
+                self.log.write({**event._asdict(), "scores": self.scores, "advantages": self.advantages})
+        return events
+
+    def snapshot(self):
+        return {"scores": dict(self.scores), "advantages": dict(self.advantages),
+                "stop_fight": self.stop_fight, "pending": self.pending}
+
+# ------------------------------------------------------------------
+# Match log
+# ------------------------------------------------------------------
+
+def default_log_path():
+    return os.path.join(MATCH_LOG_DIR, datetime.datetime.now().strftime("match-%Y%m%d-%H%M%S.jsonl"))
+
+
+class MatchLog:
+    """Append-only JSON-lines match log; a background thread does all file I/O."""
+
+    def __init__(self, path=None):
+        self.path = path or default_log_path()
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True, name="match-log")
+        self._writer.start()
+
+    def write(self, record):
+        """Queue a record; serialised immediately, written later. Never blocks."""
+        record = {"time": time.time(), **record}
+        self._queue.put(json.dumps(record, default=str))
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                line = self._queue.get()
+                # write everything already queued before paying for a flush
+                while line is not None:
+                    f.write(line + "\n")
+                    try:
+                        line = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                f.flush()
+                if line is None:
+                    return